@@ -1 +1,13 @@
-from .markusmoss import *
+import importlib
+
+__all__ = ["MarkusMoss"]
+
+
+def __getattr__(name):
+    # The markusmoss module imports mosspy, markusapi, requests and bs4 so it is only
+    # loaded once one of its attributes is accessed. This keeps the cli fast when it
+    # does not need MarkusMoss (--help, --generate-config, etc.)
+    if name not in __all__:
+        # submodules (ex: from . import _fastconfig) are looked up here before they are imported
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(".markusmoss", __name__), name)
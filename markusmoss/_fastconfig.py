@@ -0,0 +1,112 @@
+"""A minimal reader for the subset of TOML used by typical markusmossrc files.
+
+Only the following is supported:
+
+- comments and blank lines
+- [table] headers with a bare key
+- bare key = value pairs where value is a string without escapes, an integer, a boolean
+  or a single line array of those
+
+Anything else raises a ValueError so that the caller can fall back to a complete TOML
+parser (tomllib). This lets the common config file be read without importing one.
+"""
+from __future__ import annotations
+import re
+from typing import Any
+
+_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+_SCALAR = re.compile(r"""
+    "(?P<basic>[^"\\\x00-\x08\x0a-\x1f\x7f]*)"
+  | '(?P<literal>[^'\x00-\x08\x0a-\x1f\x7f]*)'
+  | (?P<int>[+-]?(?:0|[1-9][0-9]*))(?![0-9A-Za-z_.:+-])
+  | (?P<bool>true|false)(?![0-9A-Za-z_-])
+""", re.VERBOSE)
+_COMMENT = re.compile(r"(?:#[^\x00-\x08\x0a-\x1f\x7f]*)?")
+
+
+def _skip_whitespace(line: str, pos: int) -> int:
+    while pos < len(line) and line[pos] in " \t":
+        pos += 1
+    return pos
+
+
+def _parse_scalar(line: str, pos: int) -> tuple[Any, int]:
+    if line.startswith(('"""', "'''"), pos):
+        raise ValueError("multi-line strings are not supported")
+    match = _SCALAR.match(line, pos)
+    if match is None:
+        raise ValueError(f"unsupported value: {line[pos:]!r}")
+    if match.group("basic") is not None:
+        value = match.group("basic")
+    elif match.group("literal") is not None:
+        value = match.group("literal")
+    elif match.group("int") is not None:
+        value = int(match.group("int"))
+    else:
+        value = match.group("bool") == "true"
+    return value, match.end()
+
+
+def _parse_value(line: str, pos: int) -> tuple[Any, int]:
+    if not line.startswith("[", pos):
+        return _parse_scalar(line, pos)
+    values = []
+    pos = _skip_whitespace(line, pos + 1)
+    while not line.startswith("]", pos):
+        if line.startswith("[", pos):
+            raise ValueError("nested arrays are not supported")
+        value, pos = _parse_scalar(line, pos)
+        values.append(value)
+        pos = _skip_whitespace(line, pos)
+        if line.startswith(",", pos):
+            pos = _skip_whitespace(line, pos + 1)
+        elif not line.startswith("]", pos):
+            raise ValueError("arrays must be on a single line")
+    return values, pos + 1
+
+
+def _check_line_end(line: str, pos: int) -> None:
+    pos = _skip_whitespace(line, pos)
+    if _COMMENT.fullmatch(line, pos) is None:
+        raise ValueError(f"unexpected content: {line[pos:]!r}")
+
+
+def loads(s: str) -> dict[str, Any]:
+    """Return the contents of the TOML document s as a dictionary.
+
+    Raise a ValueError if s uses any TOML feature that is not supported by this module.
+    """
+    config: dict[str, Any] = {}
+    table = config
+    for line in s.split("\n"):
+        if line.endswith("\r"):
+            line = line[:-1]
+        pos = _skip_whitespace(line, 0)
+        if line.startswith("[", pos):
+            if line.startswith("[[", pos):
+                raise ValueError("arrays of tables are not supported")
+            pos = _skip_whitespace(line, pos + 1)
+            key = _BARE_KEY.match(line, pos)
+            if key is None:
+                raise ValueError(f"unsupported table header: {line!r}")
+            pos = _skip_whitespace(line, key.end())
+            if not line.startswith("]", pos):
+                raise ValueError(f"unsupported table header: {line!r}")
+            if key.group() in config:
+                raise ValueError(f"table {key.group()!r} is defined more than once")
+            table = config[key.group()] = {}
+            _check_line_end(line, pos + 1)
+        elif line.startswith("#", pos) or pos == len(line):
+            _check_line_end(line, pos)
+        else:
+            key = _BARE_KEY.match(line, pos)
+            if key is None:
+                raise ValueError(f"unsupported key: {line!r}")
+            pos = _skip_whitespace(line, key.end())
+            if not line.startswith("=", pos):
+                raise ValueError(f"unsupported key: {line!r}")
+            if key.group() in table:
+                raise ValueError(f"key {key.group()!r} is defined more than once")
+            table[key.group()], pos = _parse_value(line, _skip_whitespace(line, pos + 1))
+            _check_line_end(line, pos)
+    return config
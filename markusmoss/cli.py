@@ -1,34 +1,145 @@
+from __future__ import annotations
 import os
-import mosspy
-import toml
+import sys
+import json
+import pickle
+import tempfile
 import argparse
-from .markusmoss import MarkusMoss
+import importlib.util
+import functools
+import types
+from typing import Any, Mapping, Sequence
+from . import _fastconfig
 
 DEFAULTRC = "markusmossrc"
+CONFIG_CACHE = "config.pkl"
+LANGUAGES_FILE = "_languages.json"
+HELP_FLAGS = frozenset(("-h", "--help"))
+# snapshot of MarkusMoss.ACTIONS so that the markusmoss module doesn't have to be imported
+ACTIONS = (
+    "download_submission_files",
+    "download_starter_files",
+    "copy_files_to_pdf",
+    "run_moss",
+    "download_moss_report",
+    "write_final_report",
+)
 
 
-DEFAULTS = {
-    "workdir": os.getcwd(),
+# MarkusMoss options that can only be set in a config file
+CONFIG_ONLY_OPTIONS = frozenset(("exclude_matches",))
+
+
+# a workdir of None is resolved to the current working directory when the config is parsed
+DEFAULTS: Mapping[str, Any] = types.MappingProxyType({
+    "workdir": None,
     "file_glob": "**/*",
-}
-
-
-def _parse_config(pre_args):
-    args_dict = vars(pre_args).copy()
-    if os.path.isfile(pre_args.config):
-        with open(pre_args.config) as cf:
-            config_args = toml.load(cf)
-        for key, value in config_args.items():
-            if args_dict.get(key) is None:
-                args_dict[key] = value
-    for key, value in DEFAULTS.items():
-        if args_dict.get(key) is None:
-            args_dict[key] = value
-    args_dict.pop('config')
+})
+
+
+def _languages() -> Sequence[str]:
+    # snapshot of mosspy.Moss.languages so that mosspy doesn't have to be imported
+    with open(os.path.join(os.path.dirname(__file__), LANGUAGES_FILE)) as f:
+        return json.load(f)
+
+
+def _config_cache_file() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "markusmoss", CONFIG_CACHE)
+
+
+def _write_config_cache(cache_file: str, key: tuple[str, int, int], config_args: dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+    except OSError:
+        # the cache is only an optimization so failing to write it is not an error
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((key, config_args), f)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass
+
+
+def _load_config(config_file: str) -> dict[str, Any]:
+    """Return the parsed contents of config_file.
+
+    The parsed config is pickled to the user's cache directory and reused for as long as
+    the path, modification time and size of config_file stay the same.
+    """
+    with open(config_file, "rb") as cf:
+        st = os.fstat(cf.fileno())
+        key = (os.path.abspath(config_file), st.st_mtime_ns, st.st_size)
+        cache_file = _config_cache_file()
+        try:
+            with open(cache_file, "rb") as f:
+                cached_key, config_args = pickle.load(f)
+            if cached_key == key:
+                return config_args
+        except Exception:
+            pass
+        config_text = cf.read().decode()
+    try:
+        config_args = _fastconfig.loads(config_text)
+    except ValueError:
+        # the config uses TOML features that the fast reader does not support
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            import tomli as tomllib
+        config_args = tomllib.loads(config_text)
+    _write_config_cache(cache_file, key, config_args)
+    return config_args
+
+
+def _load_python_config(config_file: str) -> dict[str, Any]:
+    """Return the variables defined in the python file config_file that are markusmoss options.
+
+    Other variables (helper constants, imported modules, etc.) are ignored. The file is imported
+    like a regular module so python's bytecode cache is used instead of parsing it every time.
+    """
+    spec = importlib.util.spec_from_file_location(DEFAULTRC, config_file)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load config file {config_file}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    options = _config_options()
+    return {k: v for k, v in vars(module).items() if k in options}
+
+
+def _config_options() -> frozenset[str]:
+    """Return the names of the options that can be set in a config file."""
+    dests = {action.dest for action in _build_parser()._actions}
+    return frozenset(dests - {"help", "config", "generate_config"}) | CONFIG_ONLY_OPTIONS
+
+
+def _parse_config(pre_args: argparse.Namespace) -> dict[str, Any]:
+    config_file = pre_args.config or os.path.join(os.getcwd(), DEFAULTRC)
+    # a python config file (<config>.py) takes precedence over the toml one
+    python_config_file = config_file if config_file.endswith(".py") else f"{config_file}.py"
+    if os.path.isfile(python_config_file):
+        config_args: dict[str, Any] = _load_python_config(python_config_file)
+    else:
+        try:
+            config_args = _load_config(config_file)
+        except (FileNotFoundError, IsADirectoryError):
+            config_args = {}
+    # arguments given on the command line take precedence over the config file which takes
+    # precedence over the defaults
+    args_dict = {**DEFAULTS, **config_args}
+    args_dict.update((k, v) for k, v in vars(pre_args).items() if v is not None and k != "config")
+    if args_dict["workdir"] is None:
+        args_dict["workdir"] = os.getcwd()
     return args_dict
 
 
-def _parse_args():
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument("--markus-api-key")
     parser.add_argument("--markus-url")
@@ -36,34 +147,46 @@ def _parse_args():
     parser.add_argument("--markus-course")
     parser.add_argument("--moss-userid")
     parser.add_argument("--moss-report-url")
-    parser.add_argument("--config", default=os.path.join(os.getcwd(), DEFAULTRC))
+    parser.add_argument("--config")
     parser.add_argument("--workdir")
-    parser.add_argument("--actions", nargs="*", default=None, choices=MarkusMoss.ACTIONS)
-    parser.add_argument("--language", choices=mosspy.Moss.languages)
+    parser.add_argument("--actions", nargs="*", default=None, choices=ACTIONS)
+    parser.add_argument("--language", choices=_languages(), metavar="LANGUAGE",
+                        help="one of: %(choices)s")
     parser.add_argument("--file-glob")
+    parser.add_argument("--api-cache-ttl", type=int)
     parser.add_argument("--groups", nargs="*", default=None)
     parser.add_argument("--generate-config", nargs='?', default=-1)
     parser.add_argument("-f", "--force", action="store_true")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("-s", "--selected-groups", nargs='+',
                         help="A single match number, or a list of group names")
+    return parser
+
 
-    return _parse_config(parser.parse_args())
+def _parse_args() -> dict[str, Any]:
+    return _parse_config(_build_parser().parse_args())
 
 
-def cli():
+def cli() -> None:
+    if HELP_FLAGS.intersection(sys.argv[1:]):
+        # print help without reading the config file or importing any of the toml modules
+        _build_parser().print_help()
+        return
     kwargs = _parse_args()
-    output = kwargs.pop("generate_config")
+    # --generate-config without a path is None, which is left out of kwargs (write to stdout)
+    output = kwargs.pop("generate_config", None)
     if output != -1:
+        import tomli_w
+        # TOML has no null value so unset options are left out of the config
+        config = {k: v for k, v in kwargs.items() if v is not None}
         if output is None:
-            print(toml.dumps(kwargs))
+            sys.stdout.flush()
+            tomli_w.dump(config, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
         else:
-            with open(output, 'w') as f:
-                toml.dump(kwargs, f)
+            with open(output, 'wb') as f:
+                tomli_w.dump(config, f)
         return
-    actions = kwargs.pop("actions")
+    from .markusmoss import MarkusMoss
+    actions = kwargs.pop("actions", None)
     MarkusMoss(**kwargs).run(actions=actions)
-
-
-if __name__ == "__main__":
-    cli()
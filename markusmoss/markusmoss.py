@@ -1,6 +1,7 @@
 from __future__ import annotations
 import collections
-import glob
+import copy
+import functools
 import os
 import sys
 import csv
@@ -11,11 +12,109 @@ import mosspy
 import markusapi
 import requests
 import io
+import hashlib
+import html
+import json
+import time
+import itertools
 import bs4
+import lxml.etree
+import lxml.html
 import re
-from typing import Optional, ClassVar, Tuple, Iterable, Dict, Pattern, Iterator
+import concurrent.futures
+from typing import Any, Callable, Optional, ClassVar, Tuple, Iterable, Dict, Pattern, Iterator
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+class _FileGlob:
+    """A glob pattern (with the same syntax and hidden file handling as glob.glob with
+    recursive=True) that is matched against file paths relative to a root directory.
+    """
+    _MAGIC_RE: ClassVar[Pattern] = re.compile(r"[*?[]")
+
+    def __init__(self, pattern: str) -> None:
+        parts = pattern.replace(os.sep, "/").split("/")
+        regex = ""
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part == "**":
+                # Zero or more (non-hidden) directories. Unlike glob, a trailing ** does not
+                # match the directory that contains it (glob yields it with a trailing slash).
+                regex += r"(?:(?!\.)[^/]+/)*"
+                if last:
+                    regex += r"(?!\.)[^/]+"
+                continue
+            if self._MAGIC_RE.search(part):
+                if not part.startswith("."):
+                    regex += r"(?!\.)"
+                regex += self._translate(part)
+            else:
+                regex += re.escape(part)
+            if not last:
+                regex += "/"
+        self.regex = re.compile(regex)
+        self._max_depth = None if "**" in parts else len(parts)
+        self._match_hidden = any(part.startswith(".") for part in parts)
+
+    @staticmethod
+    def _translate(part: str) -> str:
+        """Return a regex matching the single path component glob pattern part.
+        """
+        i, n = 0, len(part)
+        res = ""
+        while i < n:
+            c = part[i]
+            i += 1
+            if c == "*":
+                res += "[^/]*"
+            elif c == "?":
+                res += "[^/]"
+            elif c == "[":
+                j = i
+                if j < n and part[j] == "!":
+                    j += 1
+                if j < n and part[j] == "]":
+                    j += 1
+                while j < n and part[j] != "]":
+                    j += 1
+                if j >= n:
+                    res += r"\["
+                else:
+                    stuff = part[i:j].replace("\\", r"\\")
+                    i = j + 1
+                    if stuff[0] == "!":
+                        stuff = "^/" + stuff[1:]
+                    elif stuff[0] in ("^", "["):
+                        stuff = "\\" + stuff
+                    res += f"[{stuff}]"
+            else:
+                res += re.escape(c)
+        return res
+
+    def iglob(self, root: str) -> Iterator[str]:
+        """Yield the paths of all files and directories under root that match this pattern.
+
+        The tree is walked once with os.scandir so no extra stat calls are needed to tell files
+        from directories.
+        """
+        yield from self._iglob(root, "", 1)
+
+    def _iglob(self, path: str, rel_path: str, depth: int) -> Iterator[str]:
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            return
+        for entry in entries:
+            hidden = entry.name.startswith(".")
+            if hidden and not self._match_hidden:
+                continue
+            entry_rel_path = rel_path + entry.name
+            if self.regex.fullmatch(entry_rel_path):
+                yield entry.path
+            if (self._max_depth is None or depth < self._max_depth) and entry.is_dir():
+                yield from self._iglob(entry.path, entry_rel_path + "/", depth + 1)
 
 
 class _HighlightedFile:
@@ -23,29 +122,24 @@ class _HighlightedFile:
         self.filename = filename
         self.language = language
         self.content_path = content_path
-        self._highlighted_lines = []
+        self._highlights = []
 
     def add_highlight(self, start: int, end: int) -> None:
         """Add the lines between (start, end) to be highlighted.
         """
-        for i in range(len(self._highlighted_lines)):
-            s, e, = self._highlighted_lines[i]
-
-            if end < s:
-                # If our pair ends before this one, simply insert.
-                self._highlighted_lines.insert(i, [start, end])
-                return
-            elif end <= e:
-                # If the end appears within the pair, modify the start as needed
-                self._highlighted_lines[i][0] = min(s, start)
-                return
-            elif start <= e:
-                # If the start appears within the pair, modify the end as needed
-                self._highlighted_lines[i][1] = max(e, end)
-                return
-
-        # Otherwise we are beyond all pairs and just add to the end
-        self._highlighted_lines.append([start, end])
+        self._highlights.append((start, end))
+
+    def highlighted_lines(self) -> list[list[int]]:
+        """Return the highlighted (start, end) line ranges in order, with overlapping
+        ranges merged together.
+        """
+        merged = []
+        for start, end in sorted(self._highlights):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
 
     def _code_block_template(self, highlight: bool = False):
         hl = ' highlight' if highlight else ''
@@ -62,22 +156,23 @@ class _HighlightedFile:
     def make_html(self) -> str:
         """Return HTML that corresponds to the contents of this _HighlightedFile.
         """
-        with open(self.content_path) as f:
-            contents = f.readlines()
         code_blocks = [f"<h1>{self.filename}</h1>"]
         current_line_start = 0
-        for (start, end) in self._highlighted_lines:
-            # Add everything from current_line_start to start
-            lines = contents[current_line_start:start - 1]
-            code_blocks.append(self.format_block(lines, current_line_start + 1))
-
-            # Add everything in start, end
-            lines = contents[start - 1:end]
-            code_blocks.append(self.format_block(lines, start, highlight=True))
-            current_line_start = end
-
-        # Add the remaining lines
-        lines = contents[current_line_start:]
+        # Read the file line by line, one block at a time, since the highlighted ranges are
+        # in order and don't overlap
+        with open(self.content_path) as f:
+            for (start, end) in self.highlighted_lines():
+                # Add everything from current_line_start to start
+                lines = list(itertools.islice(f, max(start - 1 - current_line_start, 0)))
+                code_blocks.append(self.format_block(lines, current_line_start + 1))
+
+                # Add everything in start, end
+                lines = list(itertools.islice(f, end - start + 1))
+                code_blocks.append(self.format_block(lines, start, highlight=True))
+                current_line_start = end
+
+            # Add the remaining lines
+            lines = f.readlines()
         if lines:
             code_blocks.append(self.format_block(lines, current_line_start + 1))
 
@@ -88,7 +183,7 @@ class _GroupFiles:
     def __init__(self, name: str, cover: str, members: list | None = None) -> None:
         self.name = name
         if members:
-            self.members = ["{} {}".format(member['first_name'], member['last_name'])
+            self.members = ["{} {}".format(member.first_name, member.last_name)
                             for member in members]
         else:
             self.members = [name]
@@ -153,9 +248,11 @@ class _Case:
         """
         Initialize this _Case based on information in case_file.
         """
-        with open(case_file) as f:
-            html = BeautifulSoup(f.read(), features='html5lib')
-        top_table = html.select_one("#top").select_one("table")
+        with open(case_file, 'rb') as f:
+            # Only the top table and the two match sections are needed
+            html = BeautifulSoup(f.read(), features='lxml', from_encoding='utf-8',
+                                 parse_only=SoupStrainer(id=["top", "match-0", "match-1"]))
+        top_table = html.find(id="top").find("table")
 
         # Keep the headers of the match
         current_headers = ('', '')
@@ -163,15 +260,15 @@ class _Case:
         # Build a list of match tuples in the form
         # [((href1, start, end), (href2, start, end))]
         href_line_pairs = []
-        for row in top_table.select("tr"):
-            headers = row.select("th")
-            data = row.select("td")
+        for row in top_table.find_all("tr"):
+            headers = row.find_all("th")
+            data = row.find_all("td")
             if headers:
                 current_headers = tuple([headers[i].contents[0] for i in range(0, len(headers), 2)])
             else:
                 current_pairs = []
                 for i in range(0, len(data), 2):
-                    a_href = data[i].select_one("a")
+                    a_href = data[i].find("a")
                     href = a_href.get("href").strip("#")
                     start, end = (int(num) for num in a_href.contents[0].split("-"))
                     current_pairs.append((href, start, end))
@@ -180,17 +277,15 @@ class _Case:
         # Maps the match IDs to the code
         href_to_code = {}
 
-        for match_id in ["#match-0", "#match-1"]:
-            match = html.select_one(match_id)
-            a_hrefs = match.select("a")
-            for a_href in a_hrefs:
-                match_id = a_href.get("id")
+        for match in html.find_all(id=["match-0", "match-1"]):
+            for a_href in match.find_all("a", id=True):
+                match_id = a_href["id"]
                 if not match_id:
                     continue
 
                 # Code is in the font tag following the anchor (and is the last element.)
-                content = a_href.next_element.contents[-1]
-                href_to_code[match_id] = content
+                font = a_href.next_element
+                href_to_code[match_id] = font.contents[-1]
 
         matches = []
         for pair in href_line_pairs:
@@ -246,11 +341,16 @@ class MarkusMoss:
     MOSS_REPORT_DIR: ClassVar[str] = "moss_report"
     MOSS_REPORT_URL: ClassVar[str] = "report_url.txt"
     MOSS_REPORT_DOWNLOAD: ClassVar[str] = "report"
+    API_CACHE_DIR: ClassVar[str] = ".api_cache"
+    API_CACHE_TTL: ClassVar[int] = 3600
+    _HEADER_RE: ClassVar[Pattern] = re.compile(r"(.*) \([0-9]*%\)")
+    _HTML_PARSER: ClassVar[lxml.html.HTMLParser] = lxml.html.HTMLParser(encoding="utf-8")
     FINAL_REPORT_DIR: ClassVar[str] = "final_report"
     FINAL_REPORT_CASE_OVERVIEW: ClassVar[str] = "case_overview.csv"
     SELECTED_CASES_DIR: ClassVar[str] = "selected"
     OVERVIEW_INFO: ClassVar[Tuple[str]] = ("case", "groups", "similarity (%)", "matched_lines")
     USER_INFO: ClassVar[Tuple[str]] = ("group_name", "user_name", "first_name", "last_name", "email", "id_number")
+    _UserInfo: ClassVar[type] = collections.namedtuple("UserInfo", USER_INFO)
     PRINT_PREFIX: ClassVar[str] = "[MARKUSMOSS]"
     ACTIONS: ClassVar[Tuple[str]] = (
         "download_submission_files",
@@ -261,6 +361,8 @@ class MarkusMoss:
         "write_final_report",
     )
     SELECT_OUTPUT_REPORT: ClassVar[str] = "case_report"
+    DOWNLOAD_WORKERS: ClassVar[int] = 16
+    MARKUS_API_WORKERS: ClassVar[int] = 8
 
     def __init__(
             self,
@@ -277,7 +379,8 @@ class MarkusMoss:
             force: bool = False,
             verbose: bool = False,
             selected_groups: Optional[list[str]] = None,
-            exclude_matches: Optional[dict[int | str, list[int]]] = None
+            exclude_matches: Optional[dict[int | str, list[int]]] = None,
+            api_cache_ttl: Optional[int] = None
     ) -> None:
         self.force = force
         self.verbose = verbose
@@ -293,12 +396,19 @@ class MarkusMoss:
 
         self.selected_groups = selected_groups if selected_groups else []
         self.exclude_matches = exclude_matches if exclude_matches else {}
+        self.api_cache_ttl = self.API_CACHE_TTL if api_cache_ttl is None else api_cache_ttl
         self.__group_data = None
         self.__membership_data = None
         self.__assignment_id = None
         self.__api = None
         self.__moss = None
+        self.__session = None
         self.__report_regex = None
+        self.__file_globs = {}
+        self.__found_files = {}
+        self.__formatted_headers = {}
+        self.__pandoc = None
+        self.__group_cover_contents = {}
         self.__starter_file_groups = None
         self.__markus_api_key = markus_api_key
         self.__markus_url = markus_url
@@ -321,55 +431,80 @@ class MarkusMoss:
             getattr(self, action)()
 
     def download_submission_files(self) -> None:
+        course_id, assignment_id = self._markus_course_id, self._assignment_id
+        submission_files_dir = self.submission_files_dir
+        downloads = []
         for data in self._group_data:
             clean_filename = self._clean_filename(data["group_name"])
-            destination = os.path.join(self.submission_files_dir, clean_filename)
+            destination = os.path.join(submission_files_dir, clean_filename)
             if os.path.isdir(destination) and not self.force:
                 continue
-            self._print(f"Downloading submission files for group: {data['group_name']}")
-            zip_byte_stream = self.api.get_files_from_repo(self._markus_course_id, self._assignment_id, data["id"],
-                                                           collected=True)
-            if not isinstance(zip_byte_stream, bytes):
-                sys.stderr.write(f"[MARKUSAPI ERROR]{zip_byte_stream}\n")
-                sys.stderr.flush()
-                continue
-            self._unzip_file(zip_byte_stream, destination)
+            downloads.append((data["id"], data["group_name"], destination))
+
+        def download(group_id):
+            return self.api.get_files_from_repo(course_id, assignment_id, group_id, collected=True)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.MARKUS_API_WORKERS) as executor:
+            zip_byte_streams = executor.map(download, [group_id for group_id, _, _ in downloads])
+            for zip_byte_stream, (_, group_name, destination) in zip(zip_byte_streams, downloads):
+                if not isinstance(zip_byte_stream, bytes):
+                    sys.stderr.write(f"[MARKUSAPI ERROR]{zip_byte_stream}\n")
+                    sys.stderr.flush()
+                    continue
+                self._print(f"Downloaded submission files for group: {group_name}")
+                self._unzip_file(zip_byte_stream, destination)
+        # the downloaded files may change what later file searches find
+        self.__found_files.clear()
 
     def copy_files_to_pdf(self) -> None:
         self._copy_files_to_pdf(self.submission_files_dir, self.pdf_submission_files_dir)
         self._copy_files_to_pdf(self.org_starter_files_dir, self.pdf_starter_files_dir)
 
     def download_starter_files(self) -> None:
+        course_id, assignment_id = self._markus_course_id, self._assignment_id
+        org_starter_files_dir = self.org_starter_files_dir
+        downloads = []
         for group_data in self._starter_file_groups:
-            destination = os.path.join(self.org_starter_files_dir, str(group_data["id"]))
+            destination = os.path.join(org_starter_files_dir, str(group_data["id"]))
             if os.path.isdir(destination) and not self.force:
                 continue
-            self._print(f"Downloading starter files for starter_group with id: {group_data['id']}")
-            zip_byte_stream = self.api.download_starter_file_entries(self._markus_course_id, self._assignment_id,
-                                                                     group_data["id"])
-            if not isinstance(zip_byte_stream, bytes):
-                sys.stderr.write(f"[MARKUSAPI ERROR] {zip_byte_stream}\n")
-                sys.stderr.flush()
-                continue
-            self._unzip_file(zip_byte_stream, destination)
+            downloads.append((group_data["id"], destination))
+
+        def download(starter_group_id):
+            return self.api.download_starter_file_entries(course_id, assignment_id, starter_group_id)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.MARKUS_API_WORKERS) as executor:
+            zip_byte_streams = executor.map(download, [group_id for group_id, _ in downloads])
+            for zip_byte_stream, (starter_group_id, destination) in zip(zip_byte_streams, downloads):
+                if not isinstance(zip_byte_stream, bytes):
+                    sys.stderr.write(f"[MARKUSAPI ERROR] {zip_byte_stream}\n")
+                    sys.stderr.flush()
+                    continue
+                self._print(f"Downloaded starter files for starter_group with id: {starter_group_id}")
+                self._unzip_file(zip_byte_stream, destination)
+        # the downloaded files may change what later file searches find
+        self.__found_files.clear()
 
     def run_moss(self) -> None:
         if os.path.isfile(self.moss_report_url_file) and not self.force:
             return
-        starter_files = glob.glob(os.path.join(self.org_starter_files_dir, "*", self.file_glob), recursive=True)
+        starter_files = self._find_files(self.org_starter_files_dir, f"*/{self.file_glob}")
 
         # If there are no starter files downloaded as above, then just use everything in the starter_files directory
         # that matches our file glob.
         if not starter_files:
-            starter_files = glob.glob(os.path.join(self.starter_files_dir, self.file_glob), recursive=True)
+            starter_files = self._find_files(self.starter_files_dir, self.file_glob)
+        workdir = self.workdir
+        add_base_file = self.moss.addBaseFile
         for i, filename in enumerate(starter_files):
             self._print(f"Sending starter files to MOSS {i + 1}/{len(starter_files)}", end="\r")
-            self.moss.addBaseFile(filename, os.path.relpath(filename, self.workdir))
+            add_base_file(filename, os.path.relpath(filename, workdir))
         self._print()
-        submission_files = glob.glob(os.path.join(self.submission_files_dir, "*", self.file_glob), recursive=True)
+        submission_files = self._find_files(self.submission_files_dir, f"*/{self.file_glob}")
+        add_file = self.moss.addFile
         for i, filename in enumerate(submission_files):
             self._print(f"Sending submission files to MOSS {i + 1}/{len(submission_files)}", end="\r")
-            self.moss.addFile(filename, os.path.relpath(filename, self.workdir))
+            add_file(filename, os.path.relpath(filename, workdir))
         self._print()
         self._print(f"Running moss")
         self.__moss_report_url = self.moss.send()
@@ -378,30 +513,35 @@ class MarkusMoss:
         with open(self.moss_report_url_file, "w") as f:
             f.write(self.moss_report_url)
 
+    def _fetch_url(self, url: str) -> bytes:
+        """Return the body of the page at url."""
+        return self.session.get(url).content
+
     @staticmethod
-    def _parse_url(url):
-        data = requests.get(url).content.decode()
-        return bs4.BeautifulSoup(data, features='html5lib')
+    def _parse_tags(content: bytes, name: str, **attrs) -> list[bs4.Tag]:
+        """Return all name tags with the given attrs in the html page content."""
+        strainer = SoupStrainer(name, **attrs)
+        parsed_html = bs4.BeautifulSoup(content, features='lxml', from_encoding='utf-8', parse_only=strainer)
+        return parsed_html.find_all(strainer)
 
-    def _localize_page_contents(self, content: BeautifulSoup) -> str:
-        """Return a string of content's body, converting all URLs into
-        relative paths.
-        """
-        return str(content).replace(self.__moss_report_url, '.')
+    def _localize_page_contents(self, content: bytes) -> bytes:
+        """Return content, converting all URLs into relative paths."""
+        return content.replace(self.__moss_report_url.encode(), b'.')
 
     def _moss_download(self, url, dest_dir):
-        parsed_html = self._parse_url(url)
-        with open(os.path.join(dest_dir, 'index.html'), 'w') as f:
-            f.write(self._localize_page_contents(parsed_html))
-        urls = {u for u in (a.attrs.get('href') for a in parsed_html.find_all('a')) if u.startswith(url)}
-        for url_ in urls:
-            parsed_html = self._parse_url(url_)
-            with open(os.path.join(dest_dir, os.path.basename(url_)), 'w') as f:
-                f.write(self._localize_page_contents(parsed_html))
-            for src_url in [f.attrs['src'] for f in parsed_html.find_all('frame')]:
-                with open(os.path.join(dest_dir, os.path.basename(src_url)), 'w', encoding='utf-8') as f:
-                    contents = self._parse_url(f"{url}/{src_url}")
-                    f.write(self._localize_page_contents(contents))
+        index = self._fetch_url(url)
+        with open(os.path.join(dest_dir, 'index.html'), 'wb') as f:
+            f.write(self._localize_page_contents(index))
+        urls = {a['href'] for a in self._parse_tags(index, 'a', href=True) if a['href'].startswith(url)}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.DOWNLOAD_WORKERS) as executor:
+            pages = dict(zip(urls, executor.map(self._fetch_url, urls)))
+            # frames may be shared between pages so each distinct frame is only downloaded once
+            src_urls = {f"{url}/{f['src']}" for content in pages.values()
+                        for f in self._parse_tags(content, 'frame', src=True)} - pages.keys()
+            pages.update(zip(src_urls, executor.map(self._fetch_url, src_urls)))
+        for url_, content in pages.items():
+            with open(os.path.join(dest_dir, os.path.basename(url_)), 'wb') as f:
+                f.write(self._localize_page_contents(content))
 
     def download_moss_report(self) -> None:
         if not os.path.isdir(self.moss_report_download_dir) or self.force:
@@ -416,7 +556,8 @@ class MarkusMoss:
             os.makedirs(assignment_report_dir, exist_ok=True)
             if os.path.isdir(self.starter_files_dir):
                 self._copy_starter_files(assignment_report_dir)
-            with open(os.path.join(assignment_report_dir, self.FINAL_REPORT_CASE_OVERVIEW), "w") as overview_f:
+            overview_file = os.path.join(assignment_report_dir, self.FINAL_REPORT_CASE_OVERVIEW)
+            with open(overview_file, "w", newline="") as overview_f:
                 overview_writer = csv.writer(overview_f)
                 overview_writer.writerow(self.OVERVIEW_INFO)
                 report_iter = self._parse_html_report()
@@ -431,6 +572,8 @@ class MarkusMoss:
                         self._copy_submission_files(group, case_dir)
                     self._write_case_report(groups, case_dir)
                     overview_writer.writerow((case, ";".join(groups), similarity, matched_lines))
+                    # each case takes a while to create so keep the overview up to date with the cases so far
+                    overview_f.flush()
 
     @property
     def markus_api_key(self) -> str:
@@ -534,10 +677,22 @@ class MarkusMoss:
             self.__moss = mosspy.Moss(self.moss_userid, self.language)
         return self.__moss
 
+    @property
+    def session(self) -> requests.Session:
+        if self.__session is None:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=self.DOWNLOAD_WORKERS,
+                                                    pool_maxsize=self.DOWNLOAD_WORKERS)
+            self.__session = requests.Session()
+            self.__session.mount("http://", adapter)
+            self.__session.mount("https://", adapter)
+        return self.__session
+
     @property
     def _group_data(self) -> Dict:
         if self.__group_data is None:
-            group_data = self.api.get_groups(self._markus_course_id, self._assignment_id)
+            course_id, assignment_id = self._markus_course_id, self._assignment_id
+            group_data = self._cached_api(f"groups_{course_id}_{assignment_id}",
+                                          lambda: self.api.get_groups(course_id, assignment_id))
             if self.groups is not None:
                 group_data = [g for g in group_data if g['group_name'] in self.groups]
             self.__group_data = group_data
@@ -569,10 +724,12 @@ class MarkusMoss:
 
     @property
     def _pandoc(self) -> str:
-        pandoc = shutil.which("pandoc")
-        if pandoc is None:
-            raise Exception(f"No 'pandoc' executable found in the path. Pandoc is required to run this action.")
-        return pandoc
+        if self.__pandoc is None:
+            pandoc = shutil.which("pandoc")
+            if pandoc is None:
+                raise Exception(f"No 'pandoc' executable found in the path. Pandoc is required to run this action.")
+            self.__pandoc = pandoc
+        return self.__pandoc
 
     @property
     def _report_regex(self) -> Pattern:
@@ -584,13 +741,52 @@ class MarkusMoss:
     def _clean_filename(filename) -> str:
         return filename.replace(" ", "_")
 
+    def _find_files(self, root: str, pattern: str) -> list[str]:
+        """Return the paths under root that match the glob pattern.
+
+        Each directory is only searched once per pattern until files are downloaded again
+        (see download_submission_files and download_starter_files).
+        """
+        key = (root, pattern)
+        if key not in self.__found_files:
+            if pattern not in self.__file_globs:
+                self.__file_globs[pattern] = _FileGlob(pattern)
+            self.__found_files[key] = list(self.__file_globs[pattern].iglob(root))
+        return self.__found_files[key]
+
     def _print(self, *args, **kwargs) -> None:
         if self.verbose:
             print(self.PRINT_PREFIX, *args, **kwargs)
 
+    def _cached_api(self, name: str, call: Callable[[], Any]) -> Any:
+        """Return the result of the MarkUs API call, caching it in the workdir as name.
+
+        A cached result is reused for api_cache_ttl seconds unless force is True. Results are
+        cached separately for each MarkUs url and api key. Only lists are cached since the API
+        returns anything else when a request fails.
+        """
+        if self.__workdir is None or self.api_cache_ttl <= 0:
+            return call()
+        server = hashlib.sha256(f"{self.markus_url}\n{self.markus_api_key}".encode()).hexdigest()[:16]
+        cache_file = os.path.join(self.workdir, self.API_CACHE_DIR, server, f"{name}.json")
+        if not self.force:
+            try:
+                if time.time() - os.path.getmtime(cache_file) < self.api_cache_ttl:
+                    with open(cache_file) as f:
+                        return json.load(f)
+            except (OSError, ValueError):
+                pass
+        result = call()
+        if isinstance(result, list):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump(result, f)
+        return result
+
     def _find_assignment_id(self) -> int:
         short_ids = []
-        assignment_data = self.api.get_assignments(self._markus_course_id)
+        course_id = self._markus_course_id
+        assignment_data = self._cached_api(f"assignments_{course_id}", lambda: self.api.get_assignments(course_id))
         for data in assignment_data:
             short_ids.append(data.get("short_identifier"))
             if data.get("short_identifier") == self.markus_assignment:
@@ -600,7 +796,7 @@ class MarkusMoss:
 
     def _find_course_id(self) -> int:
         short_ids = []
-        course_data = self.api.get_all_courses()
+        course_data = self._cached_api("courses", self.api.get_all_courses)
         for data in course_data:
             short_ids.append(data.get("name"))
             if data.get("name") == self.__markus_course:
@@ -609,25 +805,44 @@ class MarkusMoss:
         raise Exception(msg)
 
     def _get_group_membership_info(self) -> Dict:
-        user_info = {u["id"]: {k: u.get(k) for k in self.USER_INFO} for u in
-                     self.api.get_all_roles(self._markus_course_id)}
+        # only keep the info of users who are members of one of the groups
+        member_ids = {m["role_id"] for data in self._group_data for m in data["members"]}
+        course_id = self._markus_course_id
+        roles = self._cached_api(f"roles_{course_id}", lambda: self.api.get_all_roles(course_id))
+        user_info = {u["id"]: self._UserInfo._make(u.get(k) for k in self.USER_INFO) for u in roles
+                     if u["id"] in member_ids}
         members = collections.defaultdict(list)
         for data in self._group_data:
-            for role_id in (m["role_id"] for m in data["members"]):
-                user_info[role_id]["group_name"] = data["group_name"]
-                members[data["group_name"]].append(user_info[role_id])
+            group_name = data["group_name"]
+            members[group_name] = [user_info[m["role_id"]]._replace(group_name=group_name) for m in data["members"]]
         return members
 
     def _copy_files_to_pdf(self, source_dir: str, dest_dir: str) -> None:
-        for source_file in glob.iglob(os.path.join(source_dir, "*", self.file_glob), recursive=True):
-            rel_source = os.path.relpath(source_file, source_dir)
-            rel_destination = self._file_to_pdf(rel_source)
-            abs_destination = os.path.join(dest_dir, rel_destination)
-            if self._copy_file_to_pdf(source_file, abs_destination):
-                self._print(f"Converting {rel_source} to pdf: {rel_destination}")
+        # pandoc runs in a subprocess so the conversions can run in parallel threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = []
+            for source_file in self._find_files(source_dir, f"*/{self.file_glob}"):
+                rel_source = os.path.relpath(source_file, source_dir)
+                rel_destination = self._file_to_pdf(rel_source)
+                abs_destination = os.path.join(dest_dir, rel_destination)
+                future = executor.submit(self._copy_file_to_pdf, source_file, abs_destination)
+                futures.append((future, rel_source, rel_destination))
+            for future, rel_source, rel_destination in futures:
+                if future.result():
+                    self._print(f"Converting {rel_source} to pdf: {rel_destination}")
 
     def _copy_file_to_pdf(self, source_file: str, destination: str) -> bool:
         if os.path.isfile(source_file) and (not os.path.isfile(destination) or self.force):
+            try:
+                with open(source_file, "rb") as f:
+                    source = f.read()
+            except OSError:
+                sys.stderr.write(f"[ERROR] Could not copy {source_file} to PDF\n")
+                sys.stderr.flush()
+                return False
+            filename = os.path.basename(source_file)
+            content = b"".join((b"# ", filename.encode(errors="replace"), b"\n\n```{.", self.language.encode(),
+                                b" .numberLines}\n", source, b"\n```"))
             os.makedirs(os.path.dirname(destination), exist_ok=True)
             proc = subprocess.Popen(
                 [self._pandoc,
@@ -640,17 +855,6 @@ class MarkusMoss:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
-            with open(source_file, "r") as f:
-                filename = os.path.split(source_file)[-1]
-                try:
-                    content = b"# %b\n\n```{.%b .numberLines}\n%b\n```" % (
-                        filename.encode(errors="replace"), self.language.encode(),
-                        f.read().encode()
-                    )
-                except:
-                    sys.stderr.write(f"[ERROR] Could not copy {source_file} to PDF\n")
-                    sys.stderr.flush()
-                    return False
             _out, err = proc.communicate(content)
             if proc.returncode != 0:
                 sys.stderr.write(f"[PANDOC ERROR]{err}\n")
@@ -659,27 +863,32 @@ class MarkusMoss:
         return False
 
     def _parse_html_report(self) -> Iterator[Tuple[str, str, str, int, int]]:
-        with open(os.path.join(self.moss_report_download_dir, "index.html")) as f:
-            parsed_html = bs4.BeautifulSoup(f, features='html5lib')
-            for row in parsed_html.body.find("table").find_all("tr"):
+        download_dir = self.moss_report_download_dir
+        report_regex = self._report_regex
+        with open(os.path.join(download_dir, "index.html")) as f:
+            parsed_html = bs4.BeautifulSoup(f, features='lxml', parse_only=SoupStrainer("table"))
+            for row in parsed_html.find("table").find_all("tr"):
                 if row.find("th"):
                     continue
                 submission1, submission2, lines = row.find_all("td")
-                match_file = os.path.join(
-                    self.moss_report_download_dir, os.path.basename(submission1.find("a").get("href"))
-                )
+                link1 = submission1.find("a")
+                match_file = os.path.join(download_dir, os.path.basename(link1.get("href")))
                 matched_lines = int(lines.string.strip())
-                group1, matched_file, similarity = re.match(self._report_regex, submission1.find("a").string).groups()
-                group2, _, _ = re.match(self._report_regex, submission2.find("a").string).groups()
+                group1, matched_file, similarity = report_regex.match(link1.string).groups()
+                group2, _, _ = report_regex.match(submission2.find("a").string).groups()
                 yield match_file, group1, group2, similarity, matched_lines
 
     def _copy_submission_files(self, group: str, destination: str) -> None:
-        for abs_file in glob.iglob(os.path.join(self.submission_files_dir, group, self.file_glob), recursive=True):
-            rel_file = os.path.relpath(abs_file, self.submission_files_dir)
+        group_dir = os.path.join(self.submission_files_dir, group)
+        pdf_group_dir = os.path.join(self.pdf_submission_files_dir, group)
+        org_dest_dir = os.path.join(destination, group, "org")
+        pdf_dest_dir = os.path.join(destination, group, "pdf")
+        for abs_file in self._find_files(group_dir, self.file_glob):
+            rel_file = os.path.relpath(abs_file, group_dir)
             rel_pdf = self._file_to_pdf(rel_file)
-            abs_pdf = os.path.join(self.pdf_submission_files_dir, rel_pdf)
-            file_dest = os.path.join(destination, group, "org", os.path.relpath(rel_file, group))
-            pdf_dest = os.path.join(destination, group, "pdf", os.path.relpath(rel_pdf, group))
+            abs_pdf = os.path.join(pdf_group_dir, rel_pdf)
+            file_dest = os.path.join(org_dest_dir, rel_file)
+            pdf_dest = os.path.join(pdf_dest_dir, rel_pdf)
             os.makedirs(os.path.dirname(file_dest), exist_ok=True)
             os.makedirs(os.path.dirname(pdf_dest), exist_ok=True)
             self._copy_file(abs_file, file_dest)
@@ -693,22 +902,34 @@ class MarkusMoss:
             group_membership_file = os.path.join(destination, group, self.GROUP_MEMBERSHIP_FILE)
             os.makedirs(os.path.join(destination, group), exist_ok=True)
             with open(group_membership_file, "w") as f:
-                writer = csv.DictWriter(f, fieldnames=self.USER_INFO)
-                writer.writeheader()
-                for data in self._membership_data[group]:
-                    writer.writerow(data)
+                writer = csv.writer(f)
+                writer.writerow(self.USER_INFO)
+                writer.writerows(self._membership_data[group])
 
     @staticmethod
-    def _get_group_pair(group_members: set[str], group_pairs: list[set[str]]) -> set[str] | None:
+    def _get_group_pair(group_members: set[str], group_pairs: list[set[str]],
+                        pair_index: dict[str, set[int]]) -> set[str] | None:
         """Return the group pair containing all members in group_members, or None if there
         is no such group.
 
+        pair_index maps each group name to the indices of the group_pairs that contain it
+        (see _index_group_pairs).
+
         If there are multiple group pairs containing all members, the first is returned.
         """
-        for pair in group_pairs:
-            if group_members.issubset(pair):
-                return pair
-        return None
+        candidates = set.intersection(*(pair_index.get(member, set()) for member in group_members))
+        return group_pairs[min(candidates)] if candidates else None
+
+    @staticmethod
+    def _index_group_pairs(group_pairs: list[set[str]]) -> dict[str, set[int]]:
+        """Return a dictionary mapping each group name in group_pairs to the indices of
+        the group pairs that contain it.
+        """
+        pair_index = collections.defaultdict(set)
+        for i, pair in enumerate(group_pairs):
+            for group in pair:
+                pair_index[group].add(i)
+        return pair_index
 
     @staticmethod
     def _get_cases_to_groups(case_overview_path: str,
@@ -724,6 +945,7 @@ class MarkusMoss:
           write_final_report.
         """
         cases_to_groups = {}
+        pair_index = MarkusMoss._index_group_pairs(group_pairs)
 
         # Populate a dictionary mapping the relevant cases to the group(s)
         with open(case_overview_path) as f:
@@ -731,13 +953,28 @@ class MarkusMoss:
             for row in reader:
                 case, groups = row[:2]
                 groups = set(groups.split(';'))
-                group_pair = MarkusMoss._get_group_pair(groups, group_pairs)
+                group_pair = MarkusMoss._get_group_pair(groups, group_pairs, pair_index)
                 if group_pair or case in matches:
                     cases_to_groups[case] = group_pair if group_pair else groups
                     matches.add(case)
 
         return cases_to_groups
 
+    @staticmethod
+    def _link_or_copy(source: str, dest: str) -> str:
+        """Hard link source to dest, replacing dest if it exists. If source cannot be
+        linked (e.g. it is on a different file system) copy it instead.
+        """
+        try:
+            try:
+                os.link(source, dest)
+            except FileExistsError:
+                os.remove(dest)
+                os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+        return dest
+
     @staticmethod
     def _copy_file(source: str, dest: str) -> None:
         try:
@@ -750,44 +987,48 @@ class MarkusMoss:
     def _file_to_pdf(source: str) -> str:
         return f"{source}.pdf"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _report_template() -> lxml.html.HtmlElement:
+        """Return the parsed report template. This must be copied before it is modified."""
+        return lxml.html.parse(os.path.join(os.path.dirname(__file__), 'templates', 'report_template.html'),
+                               MarkusMoss._HTML_PARSER).getroot()
+
     def _copy_moss_report(self, base_html_file: str, destination: str) -> None:
         base, _ = os.path.splitext(base_html_file)
         base_basename = os.path.basename(base)
         top = f"{base}-top.html"
-        with open(os.path.join(os.path.dirname(__file__), 'templates', 'report_template.html')) as f:
-            template = bs4.BeautifulSoup(f, features='html5lib')
-        with open(base_html_file) as f:
-            base_html = bs4.BeautifulSoup(f, features='html5lib')
-            title = base_html.head.find("title").text
-            template.head.find('title').string = title
-        with open(top) as f:
-            top_html = bs4.BeautifulSoup(f, features='html5lib')
-            table = top_html.body.find("center")
-            for a in table.find_all('a'):
-                href = os.path.basename(a["href"])
-                match_file, match_num = re.match(rf'{base_basename}-([01])\.html#(\d+)', href).groups()
-                a["href"] = f"#match-{match_file}-{match_num}"
-                a["target"] = "_self"
-            top_div = template.body.find('div', {"id": "top"})
-            top_div.append(table)
+        href_re = re.compile(rf'{re.escape(base_basename)}-([01])\.html#(\d+)')
+        parser = self._HTML_PARSER
+        template = copy.deepcopy(self._report_template())
+        base_html = lxml.html.parse(base_html_file, parser).getroot()
+        template.head.find('title').text = base_html.head.findtext('title')
+        top_html = lxml.html.parse(top, parser).getroot()
+        table = top_html.body.find('.//center')
+        for a in table.xpath('.//a[@href]'):
+            href = os.path.basename(a.get("href"))
+            match_file, match_num = href_re.match(href).groups()
+            a.set("href", f"#match-{match_file}-{match_num}")
+            a.set("target", "_self")
+        # moving an element in lxml also moves the text that follows it
+        table.tail = None
+        template.body.find('.//div[@id="top"]').append(table)
         for match_i in range(2):
-            match_file = f"{base}-{match_i}.html"
-            with open(match_file) as f:
-                match_html = bs4.BeautifulSoup(f, features='html5lib')
-                match_body = match_html.body
-                for a in match_body.find_all('a'):
-                    if a.get("href"):
-                        match_file, match_num = re.match(rf'{base_basename}-([01])\.html#(\d+)', a["href"]).groups()
-                        a["href"] = f"#match-{match_file}-{match_num}"
-                        a["target"] = "_self"
-                    if a.get("name"):
-                        a["id"] = f"match-{match_i}-{a['name']}"
-            match_div = template.body.find('div', {"id": f"match-{match_i}"})
-            file_title = template.new_tag('h3')
-            match_div.append(file_title)
-            match_div.append(match_body)
-        with open(destination, 'w') as f:
-            f.write(str(template))
+            match_html = lxml.html.parse(f"{base}-{match_i}.html", parser).getroot()
+            match_body = match_html.body
+            for a in match_body.xpath('.//a[@href]'):
+                match_file, match_num = href_re.match(a.get("href")).groups()
+                a.set("href", f"#match-{match_file}-{match_num}")
+                a.set("target", "_self")
+            for a in match_body.xpath('.//a[@name]'):
+                a.set("id", f"match-{match_i}-{a.get('name')}")
+            match_div = template.body.find(f'.//div[@id="match-{match_i}"]')
+            file_title = lxml.etree.SubElement(match_div, 'h3')
+            # move the contents of the match's body into the div (instead of nesting a <body> tag)
+            file_title.tail = match_body.text
+            match_div.extend(match_body)
+        # serialize straight to the file instead of building the whole report in memory first
+        template.getroottree().write(destination, method='html', encoding='utf-8')
 
     @property
     def _html_comparison_template(self):
@@ -806,8 +1047,7 @@ class MarkusMoss:
     @staticmethod
     def _combine_html_list(html_list: list[str]):
         """Return html_list combined with <br/> tags and encased in <html> tags."""
-        combined = "<br/>".join(html_list)
-        return f"<html>{combined}</html>"
+        return f"<html>{'<br/>'.join(html_list)}</html>"
 
     def _html_code_rows(self, code1: str, code2: str,
                         code1_start: int = 1, code2_start: int = 1) -> str:
@@ -817,12 +1057,11 @@ class MarkusMoss:
         """
         code1_rows = code1.split("\n")
         code2_rows = code2.split("\n")
+        limit = self.CODE_BLOCK_LIMIT
         rows = []
-        while code1_rows or code2_rows:
-            c1 = code1_rows[:self.CODE_BLOCK_LIMIT]
-            code1_rows = code1_rows[self.CODE_BLOCK_LIMIT:]
-            c2 = code2_rows[:self.CODE_BLOCK_LIMIT]
-            code2_rows = code2_rows[self.CODE_BLOCK_LIMIT:]
+        for i in range(0, max(len(code1_rows), len(code2_rows)), limit):
+            c1 = code1_rows[i:i + limit]
+            c2 = code2_rows[i:i + limit]
             rows.append(self._html_row_template.format(code1_start=code1_start,
                                                        code1="\n".join(c1),
                                                        code2_start=code2_start,
@@ -847,8 +1086,8 @@ class MarkusMoss:
         """
         out = self._html_comparison_template.format(
             match=match_number, header1=header1, header2=header2,
-            rows=self._html_code_rows(code1=code1.replace("<", "&lt;").replace(">", "&gt;"),
-                                      code2=code2.replace("<", "&lt;").replace(">", "&gt;"),
+            rows=self._html_code_rows(code1=html.escape(code1, quote=False),
+                                      code2=html.escape(code2, quote=False),
                                       code1_start=code1_start,
                                       code2_start=code2_start)
         )
@@ -875,6 +1114,10 @@ class MarkusMoss:
     def comparison_vars(self):
         return os.path.join(os.path.dirname(__file__), 'templates', 'comparison_vars.json')
 
+    def _should_make_pdf(self, destination: str) -> bool:
+        """Return True if the pdf at destination should be (re)created."""
+        return self.force or not os.path.isfile(destination)
+
     def _html_to_pdf(self, html_str: str, destination: str, landscape: bool = False) -> bool:
         """Write html_str to a pandoc-formatted PDF at <destination>.
 
@@ -883,7 +1126,7 @@ class MarkusMoss:
         geometry = ("-V", "geometry:margin=1cm,landscape") if landscape else \
             ("-V", "geometry:margin=1cm")
 
-        if not os.path.isfile(destination) or self.force:
+        if self._should_make_pdf(destination):
             os.makedirs(os.path.dirname(destination), exist_ok=True)
             proc = subprocess.Popen(
                 [self._pandoc,
@@ -907,6 +1150,19 @@ class MarkusMoss:
             return True
         return False
 
+    def _group_cover_path(self, group_name: str, output_dir: str = None) -> str:
+        """Return the path of the cover pdf for group_name made by _make_group_cover."""
+        return os.path.join(output_dir if output_dir else self.selected_cases_dir, f"{group_name}_cover.pdf")
+
+    def _group_cover_content(self, group_name: str) -> bytes:
+        """Return the markdown content of the cover pdf for group_name."""
+        if group_name not in self.__group_cover_contents:
+            member_string = "\n".join(f"- {member.first_name} {member.last_name} "
+                                      f"({member.user_name} - {member.id_number} - {member.email})"
+                                      for member in self._membership_data[group_name])
+            self.__group_cover_contents[group_name] = f"# {group_name}\n\n{member_string}".encode()
+        return self.__group_cover_contents[group_name]
+
     def _make_group_cover(self, group_name: str, output_dir: str = None) -> str:
         """Generate a pdf named <group_name>_cover.pdf that contains:
         - The group name
@@ -915,12 +1171,13 @@ class MarkusMoss:
         Return the name of the PDF generated. If <group_name>_cover.pdf already
         exists, do nothing.
         """
-        dest = os.path.join(output_dir if output_dir else self.selected_cases_dir,
-                            f"{group_name}_cover.pdf")
+        dest = self._group_cover_path(group_name, output_dir)
 
         if os.path.exists(dest):
             return dest
 
+        content = self._group_cover_content(group_name)
+
         proc = subprocess.Popen(
             [self._pandoc,
              "--pdf-engine=xelatex",
@@ -933,14 +1190,6 @@ class MarkusMoss:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
         )
-
-        membership_info = self._membership_data[group_name]
-        member_strings = [(f"- {member['first_name']} {member['last_name']} "
-                           f"({member['user_name']} - {member['id_number']} - {member['email']})")
-                          for member in membership_info]
-        member_string = "\n".join(member_strings)
-        content = f"# {group_name}\n\n{member_string}".encode()
-
         _out, err = proc.communicate(content)
         if proc.returncode != 0:
             sys.stderr.write(f"[PANDOC ERROR]{err}\n")
@@ -952,15 +1201,14 @@ class MarkusMoss:
     def get_path_from_header(moss_header: str) -> str:
         """From a moss header, return the filepath for the given file.
         """
-        header_re = r"(.*) \([0-9]*%\)"
-        return re.match(header_re, moss_header).group(1)
+        return MarkusMoss._HEADER_RE.match(moss_header).group(1)
 
     @staticmethod
     def _get_group_and_file_from_path(file_path: str) -> tuple[str, str]:
         """From a moss header, return the filepath for the given file.
         """
-        details_re = r"[^[\\//]*[\\//]([^[\\//]*)[\\//](.*)"
-        group_name, filename = re.match(details_re, file_path).groups()
+        # file_path is <submission dir>/<group name>/<filename> where filename may contain more directories
+        _, group_name, filename = file_path.replace("\\", "/").split("/", 2)
         return group_name, filename
 
     def format_header(self, moss_header: str) -> str:
@@ -971,13 +1219,25 @@ class MarkusMoss:
         If the moss_header cannot be interpreted, then the original header
         is returned as is.
         """
+        # the same headers appear in every match of a case. Failures are not cached since
+        # they may be transient (ex: the membership data could not be fetched)
+        formatted = self.__formatted_headers.get(moss_header)
+        if formatted is None:
+            formatted = self._format_header(moss_header)
+            if formatted is None:
+                return moss_header
+            self.__formatted_headers[moss_header] = formatted
+        return formatted
+
+    def _format_header(self, moss_header: str) -> Optional[str]:
+        """Return the formatted moss_header or None if it cannot be interpreted."""
         try:
             file_path = self.get_path_from_header(moss_header)
             group_name, filename = self._get_group_and_file_from_path(file_path)
 
             group_members = self._membership_data[group_name]
             members = ", ".join([
-                "{} {}".format(member['first_name'], member['last_name'])
+                "{} {}".format(member.first_name, member.last_name)
                 for member in group_members
             ])
 
@@ -986,7 +1246,7 @@ class MarkusMoss:
 
             return f"{members}'s {filename}"
         except:
-            return moss_header
+            return None
 
     def extract_matches(self, case_file: str) -> _Case:
         """Return a _Case containing all details from case_file.
@@ -1038,23 +1298,27 @@ class MarkusMoss:
         # Maps cases to a tuple of two lists:
         # The first list is for each group's contents, the second is for
         # the case PDFs
-        report_pdfs = {}
+        report_pdfs = collections.defaultdict(lambda: ({}, []))
+
+        # Maps cases to a dictionary mapping file paths to _HighlightedFiles
+        groups_to_files_to_highlights = collections.defaultdict(dict)
 
-        # Maps cases to a dictionary mapping filenames to _HighlightedFiles
-        groups_to_files_to_highlights = {}
+        # Maps cases to a dictionary mapping group names to a dictionary mapping the group's
+        # filenames to their _HighlightedFiles
+        groups_to_group_highlights = collections.defaultdict(dict)
+
+        # The (function, *args) calls that create PDFs. These are independent of each other so
+        # they are run in parallel once everything has been collected
+        pdf_jobs = []
 
         # 1. Find all of the matches and get the basic folder structure setup
         for case in cases_to_groups:
             case_number = case.split("_")[-1]
             groups = sorted(cases_to_groups[case])
             case_dir = "_".join(groups)
-            if case_dir not in report_pdfs:
-                report_pdfs[case_dir] = ({}, [])
-
-            if case_dir not in groups_to_files_to_highlights:
-                groups_to_files_to_highlights[case_dir] = {}
-
+            group_files, case_pdfs = report_pdfs[case_dir]
             files_to_highlights = groups_to_files_to_highlights[case_dir]
+            group_highlights = groups_to_group_highlights[case_dir]
 
             # Create a directory for the pair of groups named <group1>_<group2>
             # where the group names are in alphabetical order
@@ -1069,23 +1333,26 @@ class MarkusMoss:
                 if os.path.exists(group_file_path):
                     shutil.copytree(group_file_path,
                                     os.path.join(select_case_dir, group),
-                                    dirs_exist_ok=True)
+                                    dirs_exist_ok=True,
+                                    copy_function=self._link_or_copy)
 
                 # Add all of the code files to the group's files.
-                if group not in report_pdfs[case_dir][0]:
-                    cover_path = self._make_group_cover(group, select_case_dir)
-                    report_pdfs[case_dir][0][group] = _GroupFiles(group, cover_path,
-                                                                  members=self._membership_data[group])
+                if group not in group_files:
+                    cover_path = self._group_cover_path(group, select_case_dir)
+                    pdf_jobs.append((self._make_group_cover, group, select_case_dir))
+                    group_files[group] = _GroupFiles(group, cover_path, members=self._membership_data[group])
 
                 short_path = os.path.join(group, "org")
                 code_file_path = os.path.join(select_case_dir, short_path)
                 if os.path.exists(code_file_path):
-                    for filename in os.listdir(code_file_path):
-                        path = os.path.join(code_file_path, filename)
+                    for entry in os.scandir(code_file_path):
+                        if not entry.is_file():
+                            continue
+                        filename = entry.name
                         rel_path = os.path.join('submission_files', group, filename)
-                        files_to_highlights[rel_path] = _HighlightedFile(filename,
-                                                                         path,
-                                                                         self.language)
+                        highlight = _HighlightedFile(filename, entry.path, self.language)
+                        files_to_highlights[rel_path] = highlight
+                        group_highlights.setdefault(group, {})[filename] = highlight
 
             # Extract all matches and related information, generating the relevant PDFs
             # Copy the match's moss.html and rename it to case_#.html
@@ -1098,46 +1365,52 @@ class MarkusMoss:
             case_name = match_details.get_name()
             case_name = case_name if case_name else case_number
             all_html = [f"<h1>{case_name}</h1>"]
+            case_pdf = os.path.join(select_case_dir, f"{case}.pdf")
+            make_case_pdf = self._should_make_pdf(case_pdf)
 
+            excluded_matches = self.exclude_matches.get(case_number, ())
             current_match_number = 1
             for i in range(len(match_details)):
                 # Skip the match if it's an exclusion
-                if case_number in self.exclude_matches and i in self.exclude_matches[case_number]:
+                if i in excluded_matches:
                     continue
 
                 match_pair = match_details[i]
                 match1, match2 = match_pair
                 for (fp, _, start, end, _) in match_pair:
-                    if fp not in files_to_highlights:
+                    highlight = files_to_highlights.get(fp)
+                    if highlight is None:
                         groupname, short_path = self._get_group_and_file_from_path(fp)
                         content_path = os.path.join(select_case_dir, groupname, "org", short_path)
-                        files_to_highlights[fp] = _HighlightedFile(short_path,
-                                                                   content_path,
-                                                                   self.language)
-                    files_to_highlights[fp].add_highlight(start, end)
-                all_html.append(self._match_to_html(current_match_number, match1.header, match2.header,
-                                                    match1.code, match2.code, match1.start, match2.start))
+                        highlight = _HighlightedFile(short_path, content_path, self.language)
+                        files_to_highlights[fp] = highlight
+                        group_highlights.setdefault(groupname, {})[short_path] = highlight
+                    highlight.add_highlight(start, end)
+                if make_case_pdf:
+                    all_html.append(self._match_to_html(current_match_number, match1.header, match2.header,
+                                                        match1.code, match2.code, match1.start, match2.start))
                 current_match_number += 1
 
-            combined_html = self._combine_html_list(all_html)
-
-            case_pdf = os.path.join(select_case_dir, f"{case}.pdf")
-            self._html_to_pdf(combined_html, case_pdf)
+            if make_case_pdf:
+                pdf_jobs.append((self._html_to_pdf, self._combine_html_list(all_html), case_pdf))
             # Add the case PDF to the list of PDFs
-            report_pdfs[case_dir][1].append((case_name, case_pdf))
+            case_pdfs.append((case_name, case_pdf))
 
         # 2. For any files that were involved in matches, highlight the relevant code.
-        for case_dir in groups_to_files_to_highlights:
+        for case_dir, group_highlights in groups_to_group_highlights.items():
             select_case_dir = os.path.join(self.selected_cases_dir, case_dir)
-            fth = groups_to_files_to_highlights[case_dir]
-            for filepath in fth:
-                group, filename = self._get_group_and_file_from_path(filepath)
-                highlight: _HighlightedFile
-                highlight = fth[filepath]
-                pdf_path = os.path.join(select_case_dir,
-                                        f"{group}_{highlight.filename}.pdf")
-                self._html_to_pdf(highlight.make_html(), pdf_path)
-                report_pdfs[case_dir][0][group].add_file(filename, pdf_path, override=True)
+            # Each file is converted separately so a file that fails to convert only loses its own PDF
+            for group, highlights in group_highlights.items():
+                for filename, highlight in highlights.items():
+                    pdf_path = os.path.join(select_case_dir, f"{group}_{highlight.filename}.pdf")
+                    if self._should_make_pdf(pdf_path):
+                        pdf_jobs.append((self._html_to_pdf, highlight.make_html(), pdf_path))
+                    report_pdfs[case_dir][0][group].add_file(filename, pdf_path, override=True)
+
+        # pandoc runs in a subprocess so the conversions can run in parallel threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for future in [executor.submit(*job) for job in pdf_jobs]:
+                future.result()
 
         import toc_pdf_merge
         for case_dir in report_pdfs:
@@ -1154,9 +1427,9 @@ class MarkusMoss:
             pm.make(self.SELECT_OUTPUT_REPORT, destination_folder=select_case_dir)
 
             # Clean up all PDFs aside from the final report
-            for filename in os.listdir(select_case_dir):
-                if filename.endswith(".pdf") and filename != f"{self.SELECT_OUTPUT_REPORT}.pdf":
-                    os.remove(os.path.join(select_case_dir, filename))
+            for entry in os.scandir(select_case_dir):
+                if entry.name.endswith(".pdf") and entry.name != f"{self.SELECT_OUTPUT_REPORT}.pdf":
+                    os.remove(entry.path)
 
     @staticmethod
     def _unzip_file(zip_byte_stream: bytes, destination: str) -> None:
@@ -1170,8 +1443,8 @@ class MarkusMoss:
                 else:
                     os.makedirs(dest, exist_ok=True)
                     try:
-                        with open(filename, "wb") as f:
-                            f.write(zf.read(fname))
+                        with zf.open(fname) as src, open(filename, "wb") as f:
+                            shutil.copyfileobj(src, f, length=1024 * 1024)
                     except Exception as e:
                         sys.stderr.write(f"[UNZIP ERROR] Could not write {filename}:\n{e}\n")
                         sys.stderr.flush()
@@ -0,0 +1,69 @@
+import sys
+import pytest
+import mosspy
+from unittest.mock import patch
+import markusmoss
+from markusmoss import cli
+
+
+class TestLanguages:
+    def test_languages_match_mosspy(self):
+        # If this fails, regenerate markusmoss/_languages.json from mosspy.Moss.languages
+        assert list(cli._languages()) == list(mosspy.Moss.languages)
+
+
+class TestActions:
+    def test_actions_match_markusmoss(self):
+        # If this fails, update cli.ACTIONS to match MarkusMoss.ACTIONS
+        assert cli.ACTIONS == markusmoss.MarkusMoss.ACTIONS
+
+
+class TestConfigCache:
+    def test_failed_write_removes_temp_file(self, tmp_path):
+        cache_file = tmp_path / "cache" / cli.CONFIG_CACHE
+        with patch("os.replace", side_effect=OSError):
+            cli._write_config_cache(str(cache_file), ("rc", 0, 0), {"markus_url": "http://example.com"})
+        assert list((tmp_path / "cache").iterdir()) == []
+
+
+class TestCli:
+    @staticmethod
+    def run_cli(monkeypatch, *args):
+        monkeypatch.setattr(sys, "argv", ["markusmoss", *args])
+        with patch.object(markusmoss.MarkusMoss, "__init__", return_value=None) as init, \
+                patch.object(markusmoss.MarkusMoss, "run") as run:
+            cli.cli()
+        return init, run
+
+    def test_runs_markusmoss(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        init, run = self.run_cli(monkeypatch, "--actions", "run_moss", "-s", "group1", "group2")
+        init.assert_called_once_with(workdir=str(tmp_path), file_glob="**/*", force=False, verbose=False,
+                                     selected_groups=["group1", "group2"])
+        run.assert_called_once_with(actions=["run_moss"])
+
+    def test_config_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        (tmp_path / cli.DEFAULTRC).write_text('markus_url = "http://example.com"\nfile_glob = "**/*.py"\n'
+                                              'selected_groups = [["group1", "group2"]]\n')
+        init, _ = self.run_cli(monkeypatch, "--file-glob", "*.hs")
+        init.assert_called_once_with(workdir=str(tmp_path), file_glob="*.hs", force=False, verbose=False,
+                                     markus_url="http://example.com", selected_groups=[["group1", "group2"]])
+
+    def test_python_config_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / cli.DEFAULTRC).write_text('markus_url = "http://toml.example.com"\n')
+        (tmp_path / f"{cli.DEFAULTRC}.py").write_text('import os\nBASE = "http://example.com"\n'
+                                                       'markus_url = BASE\n_private = 1\n'
+                                                       'exclude_matches = {1: [2]}\n')
+        init, _ = self.run_cli(monkeypatch)
+        init.assert_called_once_with(workdir=str(tmp_path), file_glob="**/*", force=False, verbose=False,
+                                     markus_url="http://example.com", exclude_matches={1: [2]})
+
+    def test_python_config_file_errors(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / cli.DEFAULTRC).write_text('markus_url = "http://toml.example.com"\n')
+        (tmp_path / f"{cli.DEFAULTRC}.py").write_text('open("missing.txt")\n')
+        with pytest.raises(FileNotFoundError):
+            self.run_cli(monkeypatch)
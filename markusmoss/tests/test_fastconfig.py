@@ -0,0 +1,44 @@
+import sys
+import pytest
+from markusmoss import _fastconfig
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+SUPPORTED = [
+    "",
+    "# just a comment\n\n",
+    'markus_api_key="abc123xyz"\nmarkus_url = "http://example.com/markus"  # comment\nmoss_userid=123456789\n',
+    "force = true\nverbose = false\nzero = 0\nnegative = -12\n",
+    "literal = 'C:\\path\\to\\workdir'\n",
+    'groups = ["group 1", "group 2",]\nactions = []\n',
+    'language = "python"\r\n\r\n[exclude]\n  key = [1, 2]\n',
+]
+
+UNSUPPORTED = [
+    'selected_groups = [["group 1", "group 2"], ["group 3"]]\n',
+    'groups = [\n  "group 1",\n]\n',
+    "exclude_matches = { 1 = [0, 8] }\n",
+    'escaped = "a\\"b"\n',
+    'multi = """abc"""\n',
+    "number = 1_000\n",
+    "number = 1.5\n",
+    "a.b = 1\n",
+    "[[tables]]\n",
+    "[a]\n[a]\n",
+    "a = 1\na = 2\n",
+    "a = 1 2\n",
+]
+
+
+class TestLoads:
+    @pytest.mark.parametrize("doc", SUPPORTED)
+    def test_matches_tomllib(self, doc):
+        assert _fastconfig.loads(doc) == tomllib.loads(doc)
+
+    @pytest.mark.parametrize("doc", UNSUPPORTED)
+    def test_unsupported(self, doc):
+        with pytest.raises(ValueError):
+            _fastconfig.loads(doc)
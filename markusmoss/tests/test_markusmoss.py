@@ -1,7 +1,11 @@
+import glob
+import os
+import re
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, PropertyMock
 from contextlib import ExitStack
 import markusmoss
+from markusmoss.markusmoss import _FileGlob, _HighlightedFile
 
 
 @pytest.fixture
@@ -29,4 +33,148 @@ class TestRun:
         with pytest.raises(AttributeError):
             markusmoss.MarkusMoss().run(actions=actions)
 
+
+class TestFileGlob:
+    @pytest.fixture
+    def file_tree(self, tmp_path):
+        for path in ["g1/a.py", "g1/b.txt", "g1/sub/c.py", "g1/sub/deep/d.py", "g1/.hidden.py",
+                     "g2/a.py", "g3/.hidden/e.py", "top.py"]:
+            os.makedirs(os.path.dirname(tmp_path / path), exist_ok=True)
+            (tmp_path / path).touch()
+        return str(tmp_path)
+
+    @pytest.mark.parametrize("pattern", ["*/**/*", "*/**/*.py", "*/*.py", "*.py", "*/sub/*",
+                                         "*/[ab].*", "*/[!a]*", "**/.hidden*", "*/?.py"])
+    def test_same_as_glob(self, file_tree, pattern):
+        expected = glob.glob(os.path.join(file_tree, pattern), recursive=True)
+        assert sorted(_FileGlob(pattern).iglob(file_tree)) == sorted(expected)
+
+    @pytest.mark.parametrize("pattern", ["**", "*/**"])
+    def test_trailing_double_star(self, file_tree, pattern):
+        # glob also yields the directory containing a trailing ** (with a trailing slash)
+        expected = [p for p in glob.glob(os.path.join(file_tree, pattern), recursive=True)
+                    if not p.endswith(os.sep)]
+        assert sorted(_FileGlob(pattern).iglob(file_tree)) == sorted(expected)
+
+
+class TestFindFiles:
+    def test_download_clears_cache(self, tmp_path):
+        mm = markusmoss.MarkusMoss(workdir=str(tmp_path))
+        (tmp_path / "a.py").touch()
+        assert mm._find_files(str(tmp_path), "*.py") == [str(tmp_path / "a.py")]
+        (tmp_path / "b.py").touch()
+        with patch.object(markusmoss.MarkusMoss, "_markus_course_id", new_callable=PropertyMock), \
+                patch.object(markusmoss.MarkusMoss, "_assignment_id", new_callable=PropertyMock), \
+                patch.object(markusmoss.MarkusMoss, "_starter_file_groups", new_callable=PropertyMock,
+                             return_value=[]):
+            mm.download_starter_files()
+        assert sorted(mm._find_files(str(tmp_path), "*.py")) == [str(tmp_path / "a.py"), str(tmp_path / "b.py")]
+
+
+class TestHighlightedFile:
+    @pytest.mark.parametrize("highlights, expected", [
+        ([], []),
+        ([(5, 8), (1, 2)], [[1, 2], [5, 8]]),
+        ([(1, 4), (3, 6)], [[1, 6]]),
+        ([(3, 4), (1, 2), (2, 3)], [[1, 4]]),
+        ([(2, 3), (5, 6), (1, 10)], [[1, 10]]),
+        ([(1, 2), (3, 4)], [[1, 2], [3, 4]]),
+    ])
+    def test_highlighted_lines(self, highlights, expected):
+        highlighted = _HighlightedFile("file.py", "file.py", "python")
+        for start, end in highlights:
+            highlighted.add_highlight(start, end)
+        assert highlighted.highlighted_lines() == expected
+
+
+class TestCachedApi:
+    @staticmethod
+    def markus_moss(tmp_path, **kwargs):
+        kwargs = {"markus_url": "http://example.com", "markus_api_key": "abc", **kwargs}
+        return markusmoss.MarkusMoss(workdir=str(tmp_path), **kwargs)
+
+    def test_reuses_cached_result(self, tmp_path):
+        mm = self.markus_moss(tmp_path)
+        assert mm._cached_api("courses", lambda: [{"id": 1}]) == [{"id": 1}]
+        assert mm._cached_api("courses", lambda: [{"id": 2}]) == [{"id": 1}]
+
+    def test_force_ignores_cached_result(self, tmp_path):
+        self.markus_moss(tmp_path)._cached_api("courses", lambda: [{"id": 1}])
+        mm = self.markus_moss(tmp_path, force=True)
+        assert mm._cached_api("courses", lambda: [{"id": 2}]) == [{"id": 2}]
+
+    def test_errors_are_not_cached(self, tmp_path):
+        mm = self.markus_moss(tmp_path)
+        assert mm._cached_api("courses", lambda: "error") == "error"
+        assert mm._cached_api("courses", lambda: [{"id": 1}]) == [{"id": 1}]
+
+    @pytest.mark.parametrize("kwargs", [{"markus_url": "http://other.example.com"}, {"markus_api_key": "xyz"}])
+    def test_cached_per_server(self, tmp_path, kwargs):
+        self.markus_moss(tmp_path)._cached_api("courses", lambda: [{"id": 1}])
+        mm = self.markus_moss(tmp_path, **kwargs)
+        assert mm._cached_api("courses", lambda: [{"id": 2}]) == [{"id": 2}]
+
+    def test_zero_ttl_disables_cache(self, tmp_path):
+        mm = self.markus_moss(tmp_path, api_cache_ttl=0)
+        mm._cached_api("courses", lambda: [{"id": 1}])
+        assert mm._cached_api("courses", lambda: [{"id": 2}]) == [{"id": 2}]
+
+
+class TestMatchToHtml:
+    def test_rows_are_limited(self):
+        mm = markusmoss.MarkusMoss(language="python")
+        code1 = "\n".join(str(i) for i in range(45))
+        code2 = "\n".join(str(i) for i in range(3))
+        rows = mm._html_code_rows(code1, code2, code1_start=5, code2_start=1)
+        assert re.findall(r'firstnumber="(\d+)"', rows) == ["5", "1", "25", "4", "45", "4"]
+        assert rows.count("<tr>") == 3
+
+    def test_code_is_escaped(self):
+        mm = markusmoss.MarkusMoss(language="python")
+        out = mm._match_to_html(1, "h1", "h2", 'if a < b & c > "d":', "x &amp; y")
+        assert 'if a &lt; b &amp; c &gt; "d":' in out
+        assert "x &amp;amp; y" in out
+
+
+class TestFormatHeader:
+    HEADER = "submission_files/g1/a.py (50%)"
+
+    def test_failures_are_not_cached(self):
+        mm = markusmoss.MarkusMoss()
+        member = markusmoss.MarkusMoss._UserInfo("g1", "u1", "First", "Last", "e", "1")
+        with patch.object(markusmoss.MarkusMoss, "_membership_data", new_callable=PropertyMock,
+                          side_effect=[Exception("API error"), {"g1": [member]}]):
+            assert mm.format_header(self.HEADER) == self.HEADER
+            assert mm.format_header(self.HEADER) == "First Last's a.py"
+
+
+class TestGetGroupAndFileFromPath:
+    @pytest.mark.parametrize("path, expected", [
+        ("submission_files/group 1/a.py", ("group 1", "a.py")),
+        ("submission_files/g1/sub/dir/a.py", ("g1", "sub/dir/a.py")),
+        ("submission_files\\g1\\a.py", ("g1", "a.py")),
+    ])
+    def test_split(self, path, expected):
+        assert markusmoss.MarkusMoss._get_group_and_file_from_path(path) == expected
+
+
+class TestGetCasesToGroups:
+    @pytest.fixture
+    def case_overview(self, tmp_path):
+        path = tmp_path / "case_overview.csv"
+        path.write_text("case_1,g1;g2,\ncase_2,g2;g3,\ncase_3,g4;g5,\ncase_4,g1;g3,\n")
+        return str(path)
+
+    def test_group_pairs(self, case_overview):
+        pairs = [{"g1", "g2"}, {"g1", "g2", "g3"}]
+        matches = set()
+        cases = markusmoss.MarkusMoss._get_cases_to_groups(case_overview, pairs, matches)
+        assert cases == {"case_1": pairs[0], "case_2": pairs[1], "case_4": pairs[1]}
+        assert matches == {"case_1", "case_2", "case_4"}
+
+    def test_matches(self, case_overview):
+        cases = markusmoss.MarkusMoss._get_cases_to_groups(case_overview, [], {"case_3"})
+        assert cases == {"case_3": {"g4", "g5"}}
+
+
 # TODO: finish tests
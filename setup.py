@@ -1,8 +1,16 @@
+import os
 import setuptools
 
 with open("README.md") as fh:
     long_description = fh.read()
 
+# Optionally compile the command line entrypoint to a C extension with mypyc
+# (MARKUSMOSS_USE_MYPYC=1 pip install .). The pure-python module is used otherwise.
+ext_modules = []
+if os.environ.get("MARKUSMOSS_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+    ext_modules = mypycify(["--follow-imports=silent", "--ignore-missing-imports", "markusmoss/cli.py"])
+
 setuptools.setup(
     name="markusmoss",
     version="0.0.1",
@@ -14,8 +22,11 @@ setuptools.setup(
     include_package_data=True,
     url="https://github.com/MarkUsProject/markus-moss",
     packages=setuptools.find_packages(),
-    install_requires=["mosspy==1.0.8", "toml==0.10.2",
-                      "html5lib==1.1", "pypdf",
+    ext_modules=ext_modules,
+    install_requires=["mosspy==1.0.8",
+                      "tomli>=1.1.0; python_version < '3.11'",
+                      "tomli_w>=1.0.0",
+                      "lxml", "pypdf",
                       "markusapi @ git+https://github.com/MarkUsProject/markus-api.git",
                       "requests>=2.32.4",
                       "urllib3>=2.5.0",